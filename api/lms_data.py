@@ -0,0 +1,75 @@
+"""WHO LMS reference tables, loaded once at import.
+
+The tables are read from data/lms.npz, which scripts/build_lms.py builds from
+the WHO CSVs in data/ (so pandas is not needed at runtime).
+
+``LMS`` maps ``(sex, indicator)`` to a read-only ``{key: (L, M, S)}`` dict.
+Keys are ``int`` months for the "length" and "weight" (for-age) tables and
+``float`` lengths in cm rounded to 1 decimal for the "wfl" tables; callers
+must round a wfl length the same way before looking it up. Keys that fall
+between two rows are served by ``interpolate``.
+"""
+import os, json
+from types import MappingProxyType
+import numpy as np
+
+# ── Setup paths ───────────────────────────────────────────────────────────────
+BASE_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+LMS_NPZ = os.path.join(DATA_DIR, "lms.npz")
+LMS_META = os.path.join(DATA_DIR, "lms_meta.json")
+
+
+def _load_lms(keys, L, M, S, key_type):
+    """Zip one table's arrays into a read-only {key: (L, M, S)} mapping."""
+    cast = int if key_type == "int" else float
+    return MappingProxyType({
+        cast(k): lms for k, lms in zip(keys.tolist(), zip(L.tolist(), M.tolist(), S.tolist()))
+    })
+
+
+def _to_arrays(lms):
+    """Lay one table out as key-sorted (keys, L, M, S) arrays."""
+    keys = sorted(lms)
+    arrays = (np.array(keys, dtype=np.float64),) + tuple(
+        np.array(col, dtype=np.float64) for col in zip(*(lms[k] for k in keys))
+    )
+    for arr in arrays:
+        arr.flags.writeable = False
+    return arrays
+
+
+def _build():
+    """Load every table once; shared by all importers via sys.modules."""
+    with open(LMS_META) as f:
+        meta = json.load(f)
+    tables = {}
+    with np.load(LMS_NPZ) as npz:
+        for name, info in meta.items():
+            tables[(info["sex"], info["indicator"])] = _load_lms(
+                npz[f"keys_{name}"], npz[f"L_{name}"], npz[f"M_{name}"], npz[f"S_{name}"], info["key"],
+            )
+    return MappingProxyType(tables)
+
+
+LMS = _build()
+
+# Column-major view of LMS for vectorized (batch) evaluation.
+LMS_ARRAYS = MappingProxyType({k: _to_arrays(v) for k, v in LMS.items()})
+
+
+def interpolate(table, key):
+    """Linearly interpolate (L, M, S) between the rows bracketing ``key``.
+
+    ``key`` may be a scalar or an array; exact matches return the row itself.
+    Raises KeyError if any key is NaN or lies outside the table's range.
+    """
+    keys, L, M, S = LMS_ARRAYS[table]
+    key = np.asarray(key, dtype=np.float64)
+    # Written as "not inside" so that NaN keys are rejected too
+    if np.any(~((key >= keys[0]) & (key <= keys[-1]))):
+        raise KeyError(key)
+    hi = np.clip(np.searchsorted(keys, key), 1, len(keys) - 1)
+    lo = hi - 1
+    t = (key - keys[lo]) / (keys[hi] - keys[lo])
+    return tuple((1 - t) * col[lo] + t * col[hi] for col in (L, M, S))
@@ -1,20 +1,28 @@
 import os, logging
+from functools import lru_cache
+from typing import Annotated, Optional
+from bisect import bisect_right
+from math import expm1, inf, isfinite, log, nextafter
+import numpy as np
+import orjson
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import pandas as pd
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field
 # ── Custom OpenAPI with servers block ──────────────────────────────────────────
 from fastapi.openapi.utils import get_openapi
 
 
 # ── Create FastAPI app ─────────────────────────────────────────────────────────
-app = FastAPI()
+# /openapi.json is served from a prebuilt file (see scripts/build_openapi.py),
+# so the built-in schema route is disabled and registered by hand below.
+app = FastAPI(openapi_url=None)
 
+OPENAPI_PATH = os.path.join(os.path.dirname(__file__), "openapi.json")
 
-def custom_openapi():
-    """Inject a stable servers list so ChatGPT recognizes only one host."""
-    if app.openapi_schema:
-        return app.openapi_schema
 
+def build_openapi_schema():
+    """Generate the schema from the routes, with a stable servers list so ChatGPT recognizes only one host."""
     openapi_schema = get_openapi(
         title="WHO Growth API",
         version="0.1.0",
@@ -26,118 +34,243 @@ def custom_openapi():
     ]
 
     # 2) Tell ChatGPT this call is safe to 'always allow'
-    if "/zscore" in openapi_schema["paths"]:
-        openapi_schema["paths"]["/zscore"]["post"]["x-openai-isConsequential"] = False
+    for path in ("/zscore", "/zscore/batch"):
+        if path in openapi_schema["paths"]:
+            openapi_schema["paths"][path]["post"]["x-openai-isConsequential"] = False
 
-    app.openapi_schema = openapi_schema
     return openapi_schema
 
+
+_openapi_bytes = None
+
+
+def _openapi_json():
+    """Raw schema bytes, read from the prebuilt file on first use."""
+    global _openapi_bytes
+    if _openapi_bytes is None:
+        try:
+            with open(OPENAPI_PATH, "rb") as f:
+                _openapi_bytes = f.read()
+        except FileNotFoundError:
+            # Not built yet (e.g. local development): fall back to introspection
+            _openapi_bytes = orjson.dumps(build_openapi_schema())
+    return _openapi_bytes
+
+
+def custom_openapi():
+    if app.openapi_schema:
+        return app.openapi_schema
+    app.openapi_schema = orjson.loads(_openapi_json())
+    return app.openapi_schema
+
 # Register the custom generator once
 app.openapi = custom_openapi
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+@app.get("/openapi.json", include_in_schema=False)
+def openapi_json():
+    return Response(content=_openapi_json(), media_type="application/json")
+
+
+@app.get("/docs", include_in_schema=False)
+def swagger_ui():
+    return get_swagger_ui_html(openapi_url="/openapi.json", title="WHO Growth API - Swagger UI")
+
+
+@app.get("/redoc", include_in_schema=False)
+def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title="WHO Growth API - ReDoc")
+
+# Set LOG_LEVEL=WARNING in production to skip per-request payload logging;
+# an unrecognised value falls back to INFO rather than failing at import.
+_log_level = logging.getLevelName(os.environ.get("LOG_LEVEL", "INFO").upper())
+if not isinstance(_log_level, int):
+    _log_level = logging.INFO
+logging.basicConfig(level=_log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# ── Setup paths ───────────────────────────────────────────────────────────────
-BASE_DIR = os.path.dirname(__file__)
-DATA_DIR = os.path.join(BASE_DIR, "..", "data")
-
-# ── Load LMS tables once at startup ───────────────────────────────────────────
-tables = {
-    ("M", "length"): pd.read_csv(os.path.join(DATA_DIR, "WHO-Boys-Length-for-age-Percentiles_LMS.csv")),
-    ("M", "weight"): pd.read_csv(os.path.join(DATA_DIR, "WHO-Boys-Weight-for-age-Percentiles_LMS.csv")),
-    ("M", "wfl"):    pd.read_csv(os.path.join(DATA_DIR, "WHO-Boys-Weight-for-length-Percentiles_LMS.csv")),
-    ("F", "length"): pd.read_csv(os.path.join(DATA_DIR, "WHO-Girls-Length-for-age-Percentiles_LMS.csv")),
-    ("F", "weight"): pd.read_csv(os.path.join(DATA_DIR, "WHO-Girls-Weight-for-age-Percentiles_LMS.csv")),
-    ("F", "wfl"):    pd.read_csv(os.path.join(DATA_DIR, "WHO-Girls-Weight-for-length-Percentiles_LMS.csv")),
+# ── LMS tables (loaded once in api.lms_data) ─────────────────────────────────
+from api.lms_data import LMS, LMS_ARRAYS, interpolate
+
+# Upper limit on the number of records accepted by /zscore/batch
+MAX_BATCH_SIZE = 1000
+
+# Total /zscore result-cache entries, split evenly across the indicators
+RESULT_CACHE_SIZE = 4096
+
+
+# ── Classification cut-offs ───────────────────────────────────────────────────
+# bisect_right puts z == -3 / -2 in the upper band; the last bound is nudged
+# just above 2 so that z == 2 still counts as "Normal".
+_BOUNDS = (-3.0, -2.0, nextafter(2.0, inf))
+THRESHOLDS = {
+    "length": (_BOUNDS, ("Severely stunted", "Moderately stunted", "Normal", "Tall")),
+    "weight": (_BOUNDS, ("Severe underweight", "Underweight", "Normal", "Overweight")),
+    "wfl":    (_BOUNDS, ("Severe wasting", "Wasting", "Normal", "Overweight")),
 }
 
 
 # ── Request schema ─────────────────────────────────────────────────────────────
 class ZScoreRequest(BaseModel):
-    sex: str            # "M" or "F"
-    indicator: str      # "length", "weight", or "wfl"
-    years: int = None
-    months: int = None
-    length: float = None
-    weight: float = None
-
-# ── Endpoint ───────────────────────────────────────────────────────────────────
-@app.post("/zscore")
-async def compute_z(request: ZScoreRequest):
-    logger.info(f"POST /zscore - payload: {request.dict()}")
-    sex = request.sex.upper()
-    ind = request.indicator.lower()
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
-    # Log the API call
-    logger.info(f"API call - Sex: {sex}, Indicator: {ind}, Years: {request.years}, Months: {request.months}, Length: {request.length}, Weight: {request.weight}")
+    sex: str                        # "M" or "F"
+    indicator: str                  # "length", "weight", or "wfl"
+    years: Optional[int] = None
+    months: Optional[int] = None
+    length: Optional[float] = None
+    weight: Optional[float] = None
 
-    # 1) Select the correct table
-    df = tables.get((sex, ind))
-    if df is None:
-        raise HTTPException(status_code=400, detail="Unknown sex or indicator")
 
-    # 2) Lookup row based on indicator
-    if ind in ("length", "weight"):
-        if request.years is None or request.months is None:
-            raise HTTPException(status_code=400, detail="Provide both years and months")
-        total_months = request.years * 12 + request.months
-        if "Month" not in df.columns:
-            raise HTTPException(status_code=500, detail="Invalid table: missing Month column")
-        df["Month"] = pd.to_numeric(df["Month"], errors="coerce")
-        row = df.loc[df["Month"] == total_months]
-        meas = request.length if ind == "length" else request.weight
-        if meas is None:
-            raise HTTPException(status_code=400, detail=("Provide length (cm)" if ind == "length" else "Provide weight (kg)"))
-    else:
+# Declared response models let Pydantic serialize results straight to JSON bytes
+class ZScoreResponse(BaseModel):
+    z_score: float
+    classification: str
+
+# ── Per-indicator handlers ─────────────────────────────────────────────────────
+# The indicator fixes which fields are required, how the lookup key is built
+# and which labels apply, so each one gets its own parser and handler built
+# once at startup instead of re-checking `ind` on every request.
+def _make_parser(ind):
+    """Build a function that validates a request and returns (key, meas) for `ind`."""
+    if ind == "wfl":
         # weight-for-length uses length as key
-        if request.length is None or request.weight is None:
-            raise HTTPException(status_code=400, detail="Provide both length (cm) and weight (kg)")
-        key_val = request.length
-        col0 = df.columns[0]
-        df[col0] = pd.to_numeric(df[col0], errors="coerce")
-        row = df.loc[df[col0] == key_val]
-        meas = request.weight
-
-    if row.empty:
-        raise HTTPException(status_code=400, detail="No data for given age or length")
-
-    # 3) Extract L, M, S
-    L = float(row["L"].values[0])
-    M = float(row["M"].values[0])
-    S = float(row["S"].values[0])
-
-    # 4) Compute z-score
-    z = ((meas / M) ** L - 1) / (L * S)
-    z_rounded = round(z, 1)
-
-    # 5) Classify
-    if ind == "length":
-        if z < -3:
-            cat = "Severely stunted"
-        elif z < -2:
-            cat = "Moderately stunted"
-        elif z <= 2:
-            cat = "Normal"
-        else:
-            cat = "Tall"
-    elif ind == "weight":
-        if z < -3:
-            cat = "Severe underweight"
-        elif z < -2:
-            cat = "Underweight"
-        elif z <= 2:
-            cat = "Normal"
-        else:
-            cat = "Overweight"
+        def lookup_key(request):
+            if request.length is None or request.weight is None:
+                raise HTTPException(status_code=400, detail="Provide both length (cm) and weight (kg)")
+            # Non-finite keys never hit the table, and NaN would bloat the result cache
+            if not isfinite(request.length):
+                raise HTTPException(status_code=400, detail="No data for given age or length")
+            return round(request.length, 1), request.weight  # wfl tables are keyed to 0.1 cm
     else:
-        if z < -3:
-            cat = "Severe wasting"
-        elif z < -2:
-            cat = "Wasting"
-        elif z <= 2:
-            cat = "Normal"
+        field = ind  # "length" / "weight" is also the name of the measured field
+        missing = "Provide length (cm)" if ind == "length" else "Provide weight (kg)"
+        months = [m for (_, i), lms in LMS.items() if i == ind for m in lms]
+        first, last = min(months), max(months)
+
+        def lookup_key(request):
+            if request.years is None or request.months is None:
+                raise HTTPException(status_code=400, detail="Provide both years and months")
+            meas = getattr(request, field)
+            if meas is None:
+                raise HTTPException(status_code=400, detail=missing)
+            key = request.years * 12 + request.months
+            # Compare as ints: huge ages would overflow the float lookup below
+            if not first <= key <= last:
+                raise HTTPException(status_code=400, detail="No data for given age or length")
+            return key, meas
+
+    def parse(request):
+        key, meas = lookup_key(request)
+        if not isfinite(meas) or meas <= 0:
+            raise HTTPException(status_code=400, detail="Length and weight must be positive finite numbers")
+        return key, meas
+
+    return parse
+
+
+def _make_handler(ind):
+    """Build the /zscore handler for `ind`: handler(sex, request) -> response dict."""
+    parse = PARSERS[ind]
+    bounds, labels = THRESHOLDS[ind]
+    tables = {sex: lms for (sex, i), lms in LMS.items() if i == ind}
+
+    @lru_cache(maxsize=RESULT_CACHE_SIZE // len(THRESHOLDS))
+    def compute(sex, key, meas):
+        """Return (rounded z-score, classification); raises KeyError if key is outside the table."""
+        # Extract L, M, S, interpolating between rows when there is no exact match
+        try:
+            L, M, S = tables[sex][key]
+        except KeyError:
+            L, M, S = (float(v) for v in interpolate((sex, ind), key))
+
+        # Compute z-score; expm1 keeps precision when meas is close to M
+        if L == 0:
+            z = log(meas / M) / S
         else:
-            cat = "Overweight"
+            z = expm1(L * log(meas / M)) / (L * S)
+
+        return round(z, 1), labels[bisect_right(bounds, z)]
+
+    def handler(sex, request):
+        key, meas = parse(request)
+        try:
+            z_rounded, cat = compute(sex, key, meas)
+        except KeyError:
+            raise HTTPException(status_code=400, detail="No data for given age or length")
+        return {"z_score": z_rounded, "classification": cat}
+
+    handler.cache_info = compute.cache_info
+    return handler
+
+
+PARSERS = {ind: _make_parser(ind) for ind in THRESHOLDS}
+HANDLERS = {ind: _make_handler(ind) for ind in THRESHOLDS}
+
+
+def _select(request: ZScoreRequest):
+    """Normalise sex/indicator and reject combinations without a table."""
+    sex = request.sex.upper()
+    ind = request.indicator.lower()
+    if (sex, ind) not in LMS:
+        raise HTTPException(status_code=400, detail="Unknown sex or indicator")
+    return sex, ind
+
+
+# ── Endpoints ──────────────────────────────────────────────────────────────────
+@app.post("/zscore", response_model=ZScoreResponse)
+def compute_z(request: ZScoreRequest):
+    # Log the API call
+    logger.info(
+        "POST /zscore sex=%s indicator=%s years=%s months=%s length=%s weight=%s",
+        request.sex, request.indicator, request.years, request.months, request.length, request.weight,
+    )
+
+    sex, ind = _select(request)
+    return HANDLERS[ind](sex, request)
+
+
+@app.post("/zscore/batch", response_model=list[ZScoreResponse])
+def compute_z_batch(requests: Annotated[list[ZScoreRequest], Field(max_length=MAX_BATCH_SIZE)]):
+    logger.info("POST /zscore/batch records=%d", len(requests))
+
+    # 1) Validate every record and group keys by table
+    groups = {}
+    for i, request in enumerate(requests):
+        try:
+            sex, ind = _select(request)
+            key, meas = PARSERS[ind](request)
+        except HTTPException as exc:
+            raise HTTPException(status_code=exc.status_code, detail=f"Item {i}: {exc.detail}")
+        table_keys = LMS_ARRAYS[(sex, ind)][0]
+        if not table_keys[0] <= key <= table_keys[-1]:
+            raise HTTPException(status_code=400, detail=f"Item {i}: No data for given age or length")
+        positions, keys, values = groups.setdefault((sex, ind), ([], [], []))
+        positions.append(i)
+        keys.append(key)
+        values.append(meas)
+
+    # 2) Interpolate L, M, S per table and compute all z-scores in one pass
+    results = [None] * len(requests)
+    for (sex, ind), (positions, keys, values) in groups.items():
+        L, M, S = interpolate((sex, ind), keys)
+        meas = np.asarray(values, dtype=np.float64)
+        log_ratio = np.log(meas / M)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(L == 0, log_ratio / S, np.expm1(L * log_ratio) / (L * S))
+
+        # 3) Classify with the same cut-offs as /zscore
+        bounds, labels = THRESHOLDS[ind]
+        cats = np.digitize(z, bounds)
+        for pos, z_i, c in zip(positions, z.tolist(), cats.tolist()):
+            results[pos] = {"z_score": round(z_i, 1), "classification": labels[c]}
+
+    return results
+
 
-    return {"z_score": z_rounded, "classification": cat}
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return {
+        "status": "ok",
+        "zscore_cache": {ind: handler.cache_info()._asdict() for ind, handler in HANDLERS.items()},
+    }
@@ -0,0 +1,79 @@
+"""Regenerate data/lms.npz and data/lms_meta.json from the WHO CSV tables.
+
+Requires pandas, which is only needed here and not at runtime. Run from the
+repository root after changing any file in data/:
+
+    python scripts/build_lms.py
+"""
+import os, math, json
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+TABLE_FILES = {
+    ("M", "length"): "WHO-Boys-Length-for-age-Percentiles_LMS.csv",
+    ("M", "weight"): "WHO-Boys-Weight-for-age-Percentiles_LMS.csv",
+    ("M", "wfl"):    "WHO-Boys-Weight-for-length-Percentiles_LMS.csv",
+    ("F", "length"): "WHO-Girls-Length-for-age-Percentiles_LMS.csv",
+    ("F", "weight"): "WHO-Girls-Weight-for-age-Percentiles_LMS.csv",
+    ("F", "wfl"):    "WHO-Girls-Weight-for-length-Percentiles_LMS.csv",
+}
+
+
+def _table_key(ind, raw):
+    """Normalise a key-column value; returns None for unusable rows."""
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value):
+        return None
+    return round(value, 1) if ind == "wfl" else int(value)
+
+
+def _read_table(ind, filename):
+    """Read one CSV into key-sorted (keys, L, M, S) arrays.
+
+    The key is the table's first column (Month, or Length for wfl).
+    """
+    df = pd.read_csv(os.path.join(DATA_DIR, filename))
+    key_col = df.columns[0]
+    rows = {}
+    for raw, L, M, S in df[[key_col, "L", "M", "S"]].itertuples(index=False):
+        key = _table_key(ind, raw)
+        if key is not None:
+            rows[key] = (float(L), float(M), float(S))
+    keys = sorted(rows)
+    L, M, S = (np.array(col, dtype=np.float64) for col in zip(*(rows[k] for k in keys)))
+    key_dtype = np.float64 if ind == "wfl" else np.int32
+    return np.array(keys, dtype=key_dtype), L, M, S
+
+
+def main():
+    arrays = {}
+    meta = {}
+    for (sex, ind), filename in TABLE_FILES.items():
+        keys, L, M, S = _read_table(ind, filename)
+        name = f"{sex}_{ind}"
+        arrays[f"keys_{name}"] = keys
+        arrays[f"L_{name}"] = L
+        arrays[f"M_{name}"] = M
+        arrays[f"S_{name}"] = S
+        meta[name] = {
+            "sex": sex,
+            "indicator": ind,
+            "key": "float" if ind == "wfl" else "int",
+            "source": filename,
+        }
+
+    np.savez_compressed(os.path.join(DATA_DIR, "lms.npz"), **arrays)
+    with open(os.path.join(DATA_DIR, "lms_meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+        f.write("\n")
+    print(f"Wrote {len(meta)} tables to data/lms.npz")
+
+
+if __name__ == "__main__":
+    main()
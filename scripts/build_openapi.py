@@ -0,0 +1,24 @@
+"""Regenerate api/openapi.json from the FastAPI routes.
+
+Run from the repository root after changing any endpoint or request model:
+
+    python scripts/build_openapi.py
+"""
+import os, sys
+
+import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.zscore import OPENAPI_PATH, build_openapi_schema  # noqa: E402
+
+
+def main():
+    schema = build_openapi_schema()
+    with open(OPENAPI_PATH, "wb") as f:
+        f.write(orjson.dumps(schema, option=orjson.OPT_INDENT_2) + b"\n")
+    print(f"Wrote {os.path.relpath(OPENAPI_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
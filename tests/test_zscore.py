@@ -0,0 +1,150 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api.lms_data import LMS, LMS_ARRAYS, interpolate
+from api.zscore import THRESHOLDS, app
+
+client = TestClient(app)
+
+
+def _meas_for_z(L, M, S, z):
+    """Invert the LMS formula: the measurement that gives z-score `z`."""
+    if L == 0:
+        return M * math.exp(S * z)
+    return M * (1 + L * S * z) ** (1 / L)
+
+
+def _records():
+    """Records across every table, with measurements at and around the cut-offs."""
+    records = []
+    for (sex, ind), lms in LMS.items():
+        for key in list(lms)[::6]:
+            L, M, S = lms[key]
+            for z in (-3.5, -3.0, -2.5, -2.0, 0.0, 2.0, 2.5):
+                for nudge in (-1e-9, 0.0, 1e-9):
+                    meas = _meas_for_z(L, M, S, z + nudge)
+                    if ind == "wfl":
+                        records.append({"sex": sex, "indicator": ind, "length": key, "weight": meas})
+                    else:
+                        years, months = divmod(key, 12)
+                        records.append({"sex": sex, "indicator": ind, "years": years, "months": months, ind: meas})
+    return records
+
+
+@pytest.mark.parametrize("z", [-3.5, -3.0, -2.5, -2.0, 0.0, 2.0, math.nextafter(2.0, math.inf), 2.5])
+def test_digitize_matches_bisect_at_cutoffs(z):
+    for bounds, _ in THRESHOLDS.values():
+        assert int(np.digitize(z, bounds)) == bisect_right(bounds, z)
+
+
+def test_cutoff_labels():
+    bounds, labels = THRESHOLDS["length"]
+    assert labels[bisect_right(bounds, -3.0)] == "Moderately stunted"
+    assert labels[bisect_right(bounds, -2.0)] == "Normal"
+    assert labels[bisect_right(bounds, 2.0)] == "Normal"
+    assert labels[bisect_right(bounds, math.nextafter(2.0, math.inf))] == "Tall"
+
+
+def test_batch_matches_single_requests():
+    records = _records()
+    for start in range(0, len(records), 1000):
+        chunk = records[start:start + 1000]
+        batch = client.post("/zscore/batch", json=chunk)
+        assert batch.status_code == 200
+        singles = [client.post("/zscore", json=r).json() for r in chunk]
+        assert batch.json() == singles
+
+
+def test_batch_reports_invalid_item():
+    records = [
+        {"sex": "M", "indicator": "weight", "years": 1, "months": 0, "weight": 9.6},
+        {"sex": "M", "indicator": "weight", "years": 1, "weight": 9.6},
+    ]
+    r = client.post("/zscore/batch", json=records)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Item 1: Provide both years and months"
+
+
+def test_batch_size_limit():
+    record = {"sex": "M", "indicator": "weight", "years": 1, "months": 0, "weight": 9.6}
+    assert client.post("/zscore/batch", json=[record] * 1000).status_code == 200
+    assert client.post("/zscore/batch", json=[record] * 1001).status_code == 422
+
+
+# ── Interpolation ──────────────────────────────────────────────────────────────
+def test_interpolate_exact_keys_return_table_rows():
+    for table, lms in LMS.items():
+        keys = list(lms)
+        assert [tuple(map(float, interpolate(table, k))) for k in keys] == [lms[k] for k in keys]
+        L, M, S = interpolate(table, keys)
+        assert list(zip(L.tolist(), M.tolist(), S.tolist())) == [lms[k] for k in keys]
+
+
+def test_interpolate_wfl_midpoint():
+    lms = LMS[("M", "wfl")]
+    lo, hi = lms[75.0], lms[75.5]
+    got = interpolate(("M", "wfl"), 75.3)
+    for g, a, b in zip(got, lo, hi):
+        assert float(g) == pytest.approx(a + 0.6 * (b - a))
+
+
+def test_interpolate_scalar_matches_array():
+    keys = [45.2, 75.3, 109.9]
+    L, M, S = interpolate(("F", "wfl"), keys)
+    for i, k in enumerate(keys):
+        assert tuple(map(float, interpolate(("F", "wfl"), k))) == (L[i], M[i], S[i])
+
+
+@pytest.mark.parametrize("table", list(LMS_ARRAYS))
+def test_interpolate_table_edges(table):
+    keys = sorted(LMS[table])
+    first, last = keys[0], keys[-1]
+    assert tuple(map(float, interpolate(table, first))) == LMS[table][first]
+    assert tuple(map(float, interpolate(table, last))) == LMS[table][last]
+    for bad in (first - 0.1, last + 0.1, math.nan, math.inf):
+        with pytest.raises(KeyError):
+            interpolate(table, bad)
+    with pytest.raises(KeyError):
+        interpolate(table, [first, math.nan])
+
+
+def test_wfl_midpoint_endpoint_matches_batch():
+    record = {"sex": "M", "indicator": "wfl", "length": 75.3, "weight": 9.0}
+    single = client.post("/zscore", json=record)
+    assert single.status_code == 200
+    assert client.post("/zscore/batch", json=[record]).json() == [single.json()]
+
+
+# ── Range and NaN rejection ────────────────────────────────────────────────────
+@pytest.mark.parametrize("record", [
+    {"sex": "M", "indicator": "wfl", "length": 44.9, "weight": 2.4},
+    {"sex": "M", "indicator": "wfl", "length": 110.1, "weight": 18.0},
+    {"sex": "F", "indicator": "length", "years": 2, "months": 1, "length": 85.0},
+    {"sex": "F", "indicator": "weight", "years": -1, "months": 0, "weight": 3.0},
+    {"sex": "M", "indicator": "weight", "years": 10**400, "months": 0, "weight": 9.0},
+])
+def test_out_of_range_keys_are_rejected(record):
+    single = client.post("/zscore", json=record)
+    assert single.status_code == 400
+    assert single.json()["detail"] == "No data for given age or length"
+    batch = client.post("/zscore/batch", json=[record])
+    assert batch.status_code == 400
+    assert batch.json()["detail"] == "Item 0: No data for given age or length"
+
+
+@pytest.mark.parametrize("body", [
+    '{"sex":"M","indicator":"wfl","length":NaN,"weight":9.0}',
+    '{"sex":"M","indicator":"wfl","length":Infinity,"weight":9.0}',
+    '{"sex":"M","indicator":"wfl","length":75.3,"weight":NaN}',
+    '{"sex":"M","indicator":"weight","years":1,"months":0,"weight":NaN}',
+    '{"sex":"M","indicator":"weight","years":1,"months":0,"weight":-Infinity}',
+    '{"sex":"M","indicator":"length","years":1,"months":0,"length":"nan"}',
+])
+def test_non_finite_values_are_rejected(body):
+    headers = {"content-type": "application/json"}
+    assert client.post("/zscore", content=body, headers=headers).status_code == 400
+    assert client.post("/zscore/batch", content=f"[{body}]", headers=headers).status_code == 400